@@ -1,16 +1,125 @@
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, jsonify
 import pandas as pd
 import joblib 
+import os
+import json
+import random
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from prediccion import predecir_con_rango, FEATURES_MODELO
+import registro_modelos
+from tipo_cambio import convertir_a_ars
 
 app = Flask(__name__)
 
-# --- CARGAR EL MODELO ENTRENADO ---
-try:
-    modelo = joblib.load('modelo_alquiler.pkl')
-    print("Modelo de alquiler (combinado) cargado exitosamente.")
-except Exception as e:
-    print(f"ERROR: No se pudo cargar el modelo 'modelo_alquiler.pkl'. {e}")
-    modelo = None 
+# --- CONFIGURACIÓN DEL MODO SOMBRA ---
+# El champion responde al usuario. Una fracción de los pedidos se vuelve
+# a predecir con el challenger en un hilo aparte (nunca en el request).
+MODO_SOMBRA = os.environ.get('MODO_SOMBRA', '1') == '1'
+FRACCION_SOMBRA = float(os.environ.get('FRACCION_SOMBRA', '0.1'))
+MAX_PENDIENTES_SOMBRA = 100  # Si el hilo se atrasa, se descartan muestras
+ARCHIVO_LOG_SOMBRA = os.path.join(registro_modelos.DIR_REGISTRO, 'sombra.jsonl')
+ARCHIVO_MODELO_LEGACY = 'modelo_alquiler.pkl'
+
+# --- CARGAR LOS MODELOS ---
+# rol -> {'modelo', 'version', 'mtime'}. Se recarga solo si cambia el puntero.
+# (mtime -1 = nunca cargado; None = el puntero no existe)
+# Cada rol tiene su lock: cargar el challenger nunca frena al champion.
+_modelos = {rol: {'modelo': None, 'version': None, 'mtime': -1} for rol in registro_modelos.ROLES}
+_locks_modelos = {rol: threading.Lock() for rol in registro_modelos.ROLES}
+_lock_log_sombra = threading.Lock()
+_lock_pendientes = threading.Lock()
+_ejecutor_sombra = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sombra')
+_pendientes_sombra = 0
+
+
+def _recargar_si_cambio(rol):
+    """Recarga el modelo del rol si su puntero del registro cambió (solo un os.stat)."""
+    ruta = registro_modelos.ruta_puntero(rol)
+    mtime = os.path.getmtime(ruta) if os.path.exists(ruta) else None
+    if mtime == _modelos[rol]['mtime']:
+        return
+    with _locks_modelos[rol]:
+        if mtime == _modelos[rol]['mtime']:
+            return
+        # El dict del rol se reemplaza entero (asignación atómica): quien lo
+        # lea sin lock ve el modelo viejo o el nuevo, nunca uno a medias
+        try:
+            modelo_rol, metadata = registro_modelos.cargar_modelo(rol)
+            version = metadata['version'] if metadata else None
+            if modelo_rol is None and rol == 'champion' and os.path.exists(ARCHIVO_MODELO_LEGACY):
+                # Compatibilidad: modelo entrenado antes de existir el registro
+                modelo_rol, version = joblib.load(ARCHIVO_MODELO_LEGACY), ARCHIVO_MODELO_LEGACY
+            _modelos[rol] = {'modelo': modelo_rol, 'version': version, 'mtime': mtime}
+            if modelo_rol is not None:
+                print(f"Modelo {rol} cargado exitosamente (versión: {version}).")
+        except Exception as e:
+            print(f"ERROR: No se pudo cargar el modelo {rol}. {e}")
+            _modelos[rol] = {'modelo': None, 'version': None, 'mtime': mtime}
+
+
+def modelo_actual(rol='champion'):
+    _recargar_si_cambio(rol)
+    actual = _modelos[rol]
+    return actual['modelo'], actual['version']
+
+
+def _evaluar_en_sombra(df_input, predicciones_champion, version_champion):
+    global _pendientes_sombra
+    try:
+        # Corre en el hilo 'sombra': si el puntero cambió, la carga del
+        # challenger (joblib.load) ocurre acá y no en el request
+        modelo_challenger, version_challenger = modelo_actual('challenger')
+        if modelo_challenger is None:
+            return
+        predicciones_challenger = modelo_challenger.predict(df_input[FEATURES_MODELO])
+        fecha = datetime.now().isoformat(timespec='seconds')
+        lineas = [
+            json.dumps({
+                'fecha': fecha,
+                'champion': version_champion, 'challenger': version_challenger,
+                'pred_champion': float(p_champion), 'pred_challenger': float(p_challenger),
+            })
+            for p_champion, p_challenger in zip(predicciones_champion, predicciones_challenger)
+        ]
+        with _lock_log_sombra:
+            with open(ARCHIVO_LOG_SOMBRA, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lineas) + "\n")
+    except Exception as e:
+        print(f"  Error en evaluación en sombra: {e}")
+    finally:
+        with _lock_pendientes:
+            _pendientes_sombra -= 1
+
+
+def enviar_a_sombra(df_input, predicciones_champion, version_champion):
+    """
+    Encola (sin esperar) la comparación con el challenger para una muestra
+    de pedidos. En el request solo se sortea y se encola: si no hay
+    challenger, el hilo 'sombra' lo detecta y termina.
+    """
+    global _pendientes_sombra
+    if not MODO_SOMBRA or random.random() >= FRACCION_SOMBRA:
+        return
+    with _lock_pendientes:
+        if _pendientes_sombra >= MAX_PENDIENTES_SOMBRA:
+            return
+        _pendientes_sombra += 1
+    _ejecutor_sombra.submit(_evaluar_en_sombra, df_input.copy(), list(predicciones_champion), version_champion)
+
+
+def normalizar_moneda(df_input):
+    """Pasa a ARS las expensas cargadas en USD, con la tasa vigente hoy."""
+    if 'Moneda_expensas' in df_input.columns:
+        es_usd = df_input['Moneda_expensas'].astype(str).str.upper().eq('USD')
+        hoy = pd.Series(pd.Timestamp.now().normalize(), index=df_input.index)
+        df_input['Expensas_ARS'] = convertir_a_ars(df_input['Expensas_ARS'], es_usd, hoy)
+    return df_input
+
+
+if modelo_actual('champion')[0] is None:
+    print("ERROR: No hay modelo champion en el registro ni 'modelo_alquiler.pkl'.")
 
 # --- Lista de Barrios ---
 BARRIOS_DISPONIBLES = sorted([
@@ -26,6 +135,7 @@ def index():
     form_data = {} 
 
     if request.method == 'POST':
+        modelo, version = modelo_actual('champion')
         if modelo is None:
             prediccion = "Error: El modelo no se pudo cargar."
         else:
@@ -38,13 +148,24 @@ def index():
                     'Baños': int(request.form['banos']),
                     'Antiguedad': int(request.form['antiguedad']),
                     'Expensas_ARS': float(request.form['expensas_ars']),
+                    'Moneda_expensas': request.form.get('moneda_expensas', 'ARS'),
                     'Barrio': request.form['barrio'],
                     # Campos que ya no usamos: Cocheras, M2 total, Amenities
                 }
                 
-                # 2. Hacer la predicción
-                valor_predicho = modelo.predict(pd.DataFrame([datos_input]))[0]
-                prediccion = f"${valor_predicho:,.0f} ARS (aprox.)"
+                # 2. Hacer la predicción (con rango opcional)
+                df_input = normalizar_moneda(pd.DataFrame([datos_input]))
+                if request.form.get('mostrar_rango'):
+                    fila = predecir_con_rango(modelo, df_input).iloc[0]
+                    valor_predicho = fila['Precio_ARS']
+                    prediccion = (f"${valor_predicho:,.0f} ARS (aprox.) | "
+                                  f"Rango: ${fila['Precio_min_ARS']:,.0f} - ${fila['Precio_max_ARS']:,.0f} ARS")
+                else:
+                    valor_predicho = modelo.predict(df_input[FEATURES_MODELO])[0]
+                    prediccion = f"${valor_predicho:,.0f} ARS (aprox.)"
+
+                # 3. Comparar con el challenger en segundo plano (no demora la respuesta)
+                enviar_a_sombra(df_input, [valor_predicho], version)
                 
                 form_data = request.form 
 
@@ -64,7 +185,9 @@ def index():
             'banos': 1,
             'antiguedad': 10,
             'expensas_ars': 50000,
-            'barrio': 'Palermo'
+            'moneda_expensas': 'ARS',
+            'barrio': 'Palermo',
+            'mostrar_rango': 'on'
         }
 
     return render_template(
@@ -74,5 +197,44 @@ def index():
         form_data=form_data 
     )
 
+
+@app.route('/api/predecir', methods=['POST'])
+def predecir_lote():
+    """
+    Scoring por lote. Recibe un JSON con una lista de propiedades
+    (con las mismas columnas que el modelo) y devuelve una predicción por
+    cada una. Con ?rango=1 agrega el rango de precio (min/max).
+    Si una propiedad trae 'Moneda_expensas': 'USD', se convierte a ARS.
+    """
+    modelo, version = modelo_actual('champion')
+    if modelo is None:
+        return jsonify({'error': "El modelo no se pudo cargar."}), 503
+
+    propiedades = request.get_json(silent=True)
+    if isinstance(propiedades, dict):
+        propiedades = propiedades.get('propiedades')
+    if not propiedades:
+        return jsonify({'error': "Se esperaba una lista de propiedades."}), 400
+
+    try:
+        df_input = pd.DataFrame(propiedades)
+        faltantes = [col for col in FEATURES_MODELO if col not in df_input.columns]
+        if faltantes:
+            return jsonify({'error': f"Faltan columnas: {faltantes}"}), 400
+        df_input = normalizar_moneda(df_input)
+
+        if request.args.get('rango') in ('1', 'true', 'si'):
+            resultado = predecir_con_rango(modelo, df_input)
+        else:
+            resultado = pd.DataFrame({'Precio_ARS': modelo.predict(df_input[FEATURES_MODELO])})
+    except Exception as e:
+        return jsonify({'error': f"Ocurrió un error inesperado al predecir: {e}"}), 400
+
+    enviar_a_sombra(df_input, resultado['Precio_ARS'].tolist(), version)
+    return jsonify({
+        'version': version,
+        'predicciones': resultado.round(0).to_dict(orient='records'),
+    })
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -7,14 +7,16 @@ from bs4 import BeautifulSoup
 import pandas as pd
 import re 
 import os 
+from perfilado import Perfilador
 
 # ===================================================================
 # --- CONFIGURACIÓN ---
 # ===================================================================
 # Archivo de entrada (el que ya tienes)
 ARCHIVO_ENTRADA = "propiedades_argenprop_FINAL_COMPLETO.xlsx"
-# Archivo de salida (el nuevo archivo que se creará)
-ARCHIVO_SALIDA = "propiedades_argenprop_CON_AMENITIES.xlsx"
+# Archivo de salida: un snapshot por día, no se pisa el anterior
+# (el viejo "propiedades_argenprop_CON_AMENITIES.xlsx" queda como historia)
+ARCHIVO_SALIDA = "propiedades_argenprop_{fecha}.xlsx"
 
 TIEMPO_MAX_ESPERA = 20      
 
@@ -192,28 +194,40 @@ def main():
     # --- ETAPA 2: VISITAR CADA LINK (SIN LÍMITE) ---
     print("--- ETAPA 2: Visitando todos los links (esto tardará)... ---")
     propiedades_actualizadas = []
+    perfil = Perfilador('argenprop')  # Perfilado opcional (PERFILAR=1, ver perfilado.py)
     
     for i, link in enumerate(links_a_procesar):
         print(f"Procesando link {i+1}/{len(links_a_procesar)}: {link}")
+        perfil.iniciar_link(link)
         try:
-            driver.get(link)
-            WebDriverWait(driver, TIEMPO_MAX_ESPERA).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, f'ul.{SELECTOR_CARACTERISTICAS_UL[1]}'))
-            )
-            time.sleep(1) 
+            with perfil.fase('driver.get'):
+                driver.get(link)
+            with perfil.fase('espera'):
+                WebDriverWait(driver, TIEMPO_MAX_ESPERA).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, f'ul.{SELECTOR_CARACTERISTICAS_UL[1]}'))
+                )
+            with perfil.fase('sleep'):
+                time.sleep(1) 
             
             page_source_detalle = driver.page_source
-            soup_detalle = BeautifulSoup(page_source_detalle, 'html.parser')
+            perfil.sumar_bytes(page_source_detalle)
+            with perfil.parseo():
+                soup_detalle = BeautifulSoup(page_source_detalle, 'html.parser')
             
             # --- Extracción de datos detallados ---
-            titulo = get_data_by_selector(soup_detalle, SELECTOR_TITULO_DETALLE[0], SELECTOR_TITULO_DETALLE[1])
-            precio = get_data_by_selector(soup_detalle, SELECTOR_PRECIO_DETALLE[0], SELECTOR_PRECIO_DETALLE[1])
-            expensas = get_expensas(soup_detalle, SELECTOR_EXPENSAS_DETALLE[0], SELECTOR_EXPENSAS_DETALLE[1])
-            barrio = get_barrio_robusto(soup_detalle, SELECTOR_UBICACION_TITULO[1], SELECTOR_UBICACION_DIRECCION[1])
-            caracteristicas = get_caracteristicas(soup_detalle, SELECTOR_CARACTERISTICAS_UL[0], SELECTOR_CARACTERISTICAS_UL[1])
+            with perfil.fase('get_data_by_selector'):
+                titulo = get_data_by_selector(soup_detalle, SELECTOR_TITULO_DETALLE[0], SELECTOR_TITULO_DETALLE[1])
+                precio = get_data_by_selector(soup_detalle, SELECTOR_PRECIO_DETALLE[0], SELECTOR_PRECIO_DETALLE[1])
+            with perfil.fase('get_expensas'):
+                expensas = get_expensas(soup_detalle, SELECTOR_EXPENSAS_DETALLE[0], SELECTOR_EXPENSAS_DETALLE[1])
+            with perfil.fase('get_barrio_robusto'):
+                barrio = get_barrio_robusto(soup_detalle, SELECTOR_UBICACION_TITULO[1], SELECTOR_UBICACION_DIRECCION[1])
+            with perfil.fase('get_caracteristicas'):
+                caracteristicas = get_caracteristicas(soup_detalle, SELECTOR_CARACTERISTICAS_UL[0], SELECTOR_CARACTERISTICAS_UL[1])
             
             # ¡¡¡EXTRACCIÓN DE AMENITIES AÑADIDA!!!
-            amenities = get_amenities(soup_detalle, SELECTOR_AMENITIES_TITULO[0], SELECTOR_AMENITIES_TITULO[1])
+            with perfil.fase('get_amenities'):
+                amenities = get_amenities(soup_detalle, SELECTOR_AMENITIES_TITULO[0], SELECTOR_AMENITIES_TITULO[1])
 
             info_propiedad = {
                 'Link': link, 'Titulo': titulo, 'Barrio': barrio,
@@ -222,24 +236,30 @@ def main():
             }
             info_propiedad.update(caracteristicas)
             propiedades_actualizadas.append(info_propiedad)
-            time.sleep(1.5) # Pausa de cortesía
+            with perfil.fase('sleep'):
+                time.sleep(1.5) # Pausa de cortesía
 
         except Exception as e:
             # Si falla, imprime el error y sigue con el próximo link
+            perfil.marcar_error(e)
             print(f"  Error procesando {link}: {e}")
             print("  Continuando con el siguiente link...")
 
     # --- Cierre y guardado ---
+    perfil.terminar_link()
     driver.quit()
     print("\nNavegador cerrado.")
+    perfil.guardar_reporte()
 
     if propiedades_actualizadas:
         print(f"\n--- Scraping Finalizado ---")
         print(f"Total de propiedades detalladas encontradas: {len(propiedades_actualizadas)}")
         df = pd.DataFrame(propiedades_actualizadas)
+        df['Fecha_scrape'] = time.strftime('%Y-%m-%d') # <-- Para el reentrenamiento incremental
+        archivo_salida = ARCHIVO_SALIDA.format(fecha=time.strftime('%Y%m%d'))
         try:
-            df.to_excel(ARCHIVO_SALIDA, index=False)
-            print(f"\n¡ÉXITO! Datos guardados en '{ARCHIVO_SALIDA}'")
+            df.to_excel(archivo_salida, index=False)
+            print(f"\n¡ÉXITO! Datos guardados en '{archivo_salida}'")
         except Exception as e:
             print(f"No se pudo guardar el Excel: {e}")
     else:
@@ -0,0 +1,176 @@
+import pandas as pd
+
+# ===================================================================
+# --- REGLAS DE CALIDAD DE DATOS ---
+# ===================================================================
+# Cada regla genera una máscara booleana POR CAMPO (True = la fila falla).
+# Todas son operaciones vectorizadas de pandas: no hay loops por fila.
+#   sobre 'crudo'  -> columnas tal cual vienen del Excel ('M2 cubierta', ...)
+#   sobre 'limpio' -> columnas ya convertidas ('M2_cubierta', 'Precio_ARS', ...)
+#   accion 'cuarentena' -> la fila se aparta y no se usa para entrenar
+#   accion 'avisar'     -> solo se cuenta en el reporte
+
+COLUMNAS_TEXTO = ['Barrio', 'Precio', 'Expensas', 'M2 cubierta', 'Ambientes', 'Dormitorios', 'Baños', 'Antiguedad']
+COLUMNAS_NUMERICAS = {
+    'M2 cubierta': 'M2_cubierta', 'Ambientes': 'Ambientes', 'Dormitorios': 'Dormitorios',
+    'Baños': 'Baños', 'Antiguedad': 'Antiguedad',
+}
+
+REGLAS = [
+    # --- Centinelas: textos que escriben los scrapers cuando algo falló ---
+    {'nombre': 'texto_error', 'tipo': 'patron', 'sobre': 'crudo', 'accion': 'cuarentena',
+     'columnas': COLUMNAS_TEXTO, 'patron': r'error extrayendo|error de script|^error$'},
+    {'nombre': 'sin_numero', 'tipo': 'patron', 'sobre': 'crudo', 'accion': 'cuarentena',
+     'columnas': ['Expensas'], 'patron': r'sin n[uú]mero'},
+    {'nombre': 'no_disponible', 'tipo': 'patron', 'sobre': 'crudo', 'accion': 'cuarentena',
+     'columnas': ['Barrio', 'M2 cubierta', 'Ambientes'], 'patron': r'no disponible'},
+    # Precio sin "$", "ARS" ni "USD" (p. ej. una celda numérica suelta):
+    # no se puede saber en qué moneda está, así que no sirve para entrenar
+    {'nombre': 'sin_moneda', 'tipo': 'sin_patron', 'sobre': 'crudo', 'accion': 'cuarentena',
+     'columnas': ['Precio'], 'patron': r'\$|usd|ars'},
+
+    # --- Tipos: había texto pero no se pudo convertir a número ---
+    {'nombre': 'no_numerico', 'tipo': 'numerico', 'sobre': 'crudo', 'accion': 'cuarentena',
+     'columnas': COLUMNAS_NUMERICAS},
+
+    # --- Rangos razonables (los NaN no fallan: se tratan aparte) ---
+    # (Un alquiler de menos de $10.000 no es un precio mensual real en ARS)
+    {'nombre': 'rango', 'tipo': 'rango', 'sobre': 'limpio', 'accion': 'cuarentena', 'columna': 'Precio_ARS', 'min': 10000},
+    {'nombre': 'rango', 'tipo': 'rango', 'sobre': 'limpio', 'accion': 'cuarentena', 'columna': 'Expensas_ARS', 'min': 0},
+    {'nombre': 'rango', 'tipo': 'rango', 'sobre': 'limpio', 'accion': 'cuarentena', 'columna': 'M2_cubierta', 'min': 10, 'max': 2000},
+    {'nombre': 'rango', 'tipo': 'rango', 'sobre': 'limpio', 'accion': 'cuarentena', 'columna': 'Ambientes', 'min': 1, 'max': 20},
+    {'nombre': 'rango', 'tipo': 'rango', 'sobre': 'limpio', 'accion': 'cuarentena', 'columna': 'Dormitorios', 'min': 0, 'max': 15},
+    {'nombre': 'rango', 'tipo': 'rango', 'sobre': 'limpio', 'accion': 'cuarentena', 'columna': 'Baños', 'min': 0, 'max': 10},
+    {'nombre': 'rango', 'tipo': 'rango', 'sobre': 'limpio', 'accion': 'cuarentena', 'columna': 'Antiguedad', 'min': 0, 'max': 200},
+    {'nombre': 'cero', 'tipo': 'rango', 'sobre': 'limpio', 'accion': 'avisar', 'columna': 'Baños', 'min': 1},
+
+    # --- Reglas cruzadas entre campos ---
+    {'nombre': 'dormitorios_mayor_ambientes', 'tipo': 'cruzada', 'sobre': 'limpio', 'accion': 'cuarentena',
+     'columnas': ['Dormitorios', 'Ambientes'], 'condicion': lambda df: df['Dormitorios'] > df['Ambientes']},
+    {'nombre': 'expensas_mayor_precio', 'tipo': 'cruzada', 'sobre': 'limpio', 'accion': 'cuarentena',
+     'columnas': ['Expensas_ARS', 'Precio_ARS'], 'condicion': lambda df: df['Expensas_ARS'] > df['Precio_ARS']},
+]
+
+# Textos que SÍ tienen un valor conocido (se reemplazan antes de convertir)
+NORMALIZACIONES = {
+    'Antiguedad': {r'estrenar': 0},  # "a estrenar" = 0 años (antes quedaba en NaN -> 0 por casualidad)
+}
+
+PREFIJO_FALLA = 'falla:'
+# Si una fuente pierde más de esta fracción de filas, es un problema del
+# archivo (formato, columnas) y no de avisos sueltos: se avisa aparte
+UMBRAL_FUENTE_EN_CUARENTENA = 0.5
+
+
+def aplicar_normalizaciones(df):
+    """Reemplaza los textos de NORMALIZACIONES por su valor (in place)."""
+    for columna, reemplazos in NORMALIZACIONES.items():
+        if columna not in df.columns:
+            continue
+        texto = df[columna].astype(str).str.lower()
+        for patron, valor in reemplazos.items():
+            df[columna] = df[columna].mask(texto.str.contains(patron, regex=True), valor)
+    return df
+
+
+def evaluar_reglas(df_crudo, df_limpio, reglas=REGLAS):
+    """
+    Evalúa todas las reglas y devuelve un DataFrame booleano con una
+    columna por (regla, campo), p. ej. 'falla:rango[M2_cubierta]'.
+    """
+    fallas = {}
+    texto_crudo = {}  # cada columna cruda se pasa a minúsculas una sola vez
+
+    def _texto(columna):
+        if columna not in texto_crudo:
+            texto_crudo[columna] = df_crudo[columna].astype('string').str.lower().str.strip()
+        return texto_crudo[columna]
+
+    for regla in reglas:
+        tipo = regla['tipo']
+        if tipo == 'patron':
+            for columna in regla['columnas']:
+                if columna in df_crudo.columns:
+                    mascara = _texto(columna).str.contains(regla['patron'], regex=True).fillna(False)
+                    fallas[(regla['nombre'], columna)] = mascara
+        elif tipo == 'sin_patron':
+            # Falla si hay un valor pero NO coincide con el patrón
+            for columna in regla['columnas']:
+                if columna in df_crudo.columns:
+                    texto = _texto(columna)
+                    coincide = texto.str.contains(regla['patron'], regex=True).fillna(False)
+                    fallas[(regla['nombre'], columna)] = texto.notna() & ~coincide
+        elif tipo == 'numerico':
+            for columna_cruda, columna_limpia in regla['columnas'].items():
+                if columna_cruda in df_crudo.columns:
+                    texto = _texto(columna_cruda)
+                    tenia_valor = texto.notna() & (texto != '') & (texto != 'nan')
+                    fallas[(regla['nombre'], columna_cruda)] = tenia_valor & df_limpio[columna_limpia].isna()
+        elif tipo == 'rango':
+            valores = df_limpio[regla['columna']]
+            mascara = pd.Series(False, index=df_limpio.index)
+            if 'min' in regla:
+                mascara |= valores < regla['min']
+            if 'max' in regla:
+                mascara |= valores > regla['max']
+            fallas[(regla['nombre'], regla['columna'])] = mascara
+        elif tipo == 'cruzada':
+            mascara = regla['condicion'](df_limpio).fillna(False)
+            fallas[(regla['nombre'], '/'.join(regla['columnas']))] = mascara
+        else:
+            raise ValueError(f"Tipo de regla desconocido: '{tipo}'")
+
+    columnas = {f"{PREFIJO_FALLA}{nombre}[{campo}]": mascara.astype(bool) for (nombre, campo), mascara in fallas.items()}
+    return pd.DataFrame(columnas, index=df_limpio.index)
+
+
+def _columnas_por_accion(columnas_falla, reglas, accion):
+    nombres = {regla['nombre'] for regla in reglas if regla['accion'] == accion}
+    return [col for col in columnas_falla if col[len(PREFIJO_FALLA):].split('[')[0] in nombres]
+
+
+def separar_cuarentena(df, reglas=REGLAS):
+    """
+    Recibe el DataFrame combinado con las columnas 'falla:...' y devuelve
+    (df_valido, df_cuarentena, resumen). El resumen cuenta fallas por
+    Fuente y por (regla, campo). Las columnas 'falla:...' se quitan.
+    """
+    columnas_falla = [col for col in df.columns if col.startswith(PREFIJO_FALLA)]
+    fallas = df[columnas_falla].fillna(False).astype(bool)
+
+    resumen = fallas.groupby(df['Fuente']).sum()
+    resumen = resumen.loc[:, resumen.sum() > 0]
+    resumen.columns = [col[len(PREFIJO_FALLA):] for col in resumen.columns]
+
+    columnas_cuarentena = _columnas_por_accion(columnas_falla, reglas, 'cuarentena')
+    en_cuarentena = fallas[columnas_cuarentena].any(axis=1)
+
+    df_cuarentena = df.loc[en_cuarentena].drop(columns=columnas_falla)
+    if len(df_cuarentena):
+        # Motivos: "rango[M2_cubierta]; texto_error[Precio]" (producto bool x str, sin loop)
+        etiquetas = pd.Series([col[len(PREFIJO_FALLA):] + '; ' for col in columnas_cuarentena],
+                              index=columnas_cuarentena, dtype=object)
+        motivos = fallas.loc[en_cuarentena, columnas_cuarentena].astype(object).dot(etiquetas)
+        df_cuarentena['Motivos'] = motivos.str.rstrip('; ')
+
+    df_valido = df.loc[~en_cuarentena].drop(columns=columnas_falla)
+    return df_valido, df_cuarentena, resumen
+
+
+def imprimir_resumen(resumen, total_filas, filas_cuarentena):
+    print(f"Calidad de datos: {filas_cuarentena} de {total_filas} filas en cuarentena.")
+    if resumen.empty:
+        return
+    print("Fallas por fuente y por regla[campo]:")
+    print(resumen.T.to_string())
+
+
+def avisar_fuentes_en_cuarentena(filas_por_fuente, df_cuarentena, umbral=UMBRAL_FUENTE_EN_CUARENTENA):
+    """Avisa las fuentes que quedaron casi enteras en cuarentena."""
+    if df_cuarentena.empty:
+        return
+    fraccion = (df_cuarentena['Fuente'].value_counts() / filas_por_fuente).dropna()
+    for fuente, valor in fraccion[fraccion > umbral].items():
+        print(f"Advertencia: '{fuente}' quedó en cuarentena en un {valor:.0%} "
+              f"({int(valor * filas_por_fuente[fuente])} de {filas_por_fuente[fuente]} filas). "
+              f"Revisar el formato del archivo.")
@@ -1,18 +1,55 @@
 import pandas as pd
 import re
+import numbers
+import argparse
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import make_column_transformer
 from sklearn.pipeline import make_pipeline
 from sklearn.metrics import r2_score
-import joblib 
 import os
+import glob
+from concurrent.futures import ProcessPoolExecutor
+from prediccion import medir_latencia, FEATURES_MODELO
+import registro_modelos
+from tipo_cambio import convertir_a_ars, es_en_dolares
+import calidad_datos
 
 # --- CONFIGURACIÓN INICIAL ---
-TASA_CAMBIO_DOLAR = 1430 
-ARCHIV_REMAX = 'propiedades_remax_DETALLADO_COMPLETO.xlsx'
-ARCHIV_ARGENPROP = 'propiedades_argenprop_FINAL_COMPLETO.xlsx' # <-- Tu nuevo archivo
+# (La conversión de USD usa la tabla fechada de tipo_cambio.py)
+# Fuente -> patrones de archivos (cada snapshot nuevo que matchee se ingiere).
+# Los scrapers escriben un snapshot por día: propiedades_<fuente>_AAAAMMDD.xlsx
+PATRONES_FUENTES = {
+    'remax': ['propiedades_remax_*.xlsx'],
+    'argenprop': ['propiedades_argenprop_*.xlsx'],
+}
+# Archivos que matchean los patrones pero NO son datos de entrenamiento.
+# FINAL_COMPLETO es la lista de links que re-escanea argenprop.py: su Precio
+# es un número suelto en USD (594 ~ 850.000 / 1430) y todos sus links ya
+# están en CON_AMENITIES con el precio en "$". Ingerirlo solo mandaba el
+# archivo entero a cuarentena en cada corrida.
+ARCHIVOS_EXCLUIDOS = ['propiedades_argenprop_FINAL_COMPLETO.xlsx']
+# Columnas que se leen de cada Excel (el resto ni se parsea).
+# Link y Fecha_scrape son opcionales (los Excel viejos no las tienen).
+COLUMNAS_REQUERIDAS = [
+    'Barrio', 'Precio', 'Expensas', 'M2 cubierta',
+    'Ambientes', 'Dormitorios', 'Baños', 'Antiguedad'
+]
+COLUMNAS_ORIGEN = COLUMNAS_REQUERIDAS + ['Link', 'Fecha_scrape']
+# Filas que no pasan las reglas de calidad_datos.py (con el motivo)
+ARCHIVO_CUARENTENA = 'datos_cuarentena.csv'
+
+# --- CONFIGURACIÓN DEL REENTRENAMIENTO INCREMENTAL ---
+ARBOLES_POR_INCREMENTO = 20   # Árboles nuevos que se ajustan sobre los datos nuevos
+MAX_ARBOLES = 200             # Tope del bosque: se retiran los árboles más viejos
+VENTANA_DIAS = 365            # Árboles entrenados con datos más viejos que esto se retiran
+VIDA_MEDIA_DIAS = 90          # Decaimiento: una fila de hace 90 días pesa la mitad
+MIN_FILAS_INCREMENTO = 20     # Con menos filas nuevas no vale la pena agregar árboles
+# Fecha fija para filas sin 'Fecha_scrape' (Excel anteriores a esa columna).
+# No se usa la fecha del archivo: un checkout o una copia la cambian y todo
+# el histórico parecería "nuevo" para el modo incremental.
+FECHA_SCRAPE_LEGACY = '2025-11-01'
 
 # Columnas comunes que usaremos para el modelo
 COLUMNAS_FINALES = [
@@ -28,8 +65,55 @@ COLUMNAS_FINALES = [
 
 # --- FUNCIONES DE LIMPIEZA SEPARADAS ---
 
-def limpiar_moneda(texto, tasa_dolar, es_remax=True):
-    """Limpia la columna de precio para CUALQUIER formato"""
+def fecha_de_scrape(df, archivo):
+    """
+    Fecha en que se scrapeó cada fila. Usa la columna 'Fecha_scrape' que
+    guardan los scrapers; si falta (archivos viejos), usa FECHA_SCRAPE_LEGACY.
+    """
+    if 'Fecha_scrape' in df.columns:
+        fechas = pd.to_datetime(df['Fecha_scrape'], errors='coerce')
+    else:
+        fechas = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    sin_fecha = fechas.isna().sum()
+    if sin_fecha:
+        print(f"Advertencia: '{archivo}' tiene {sin_fecha} filas sin Fecha_scrape. "
+              f"Se usa la fecha fija {FECHA_SCRAPE_LEGACY}.")
+    return fechas.fillna(pd.Timestamp(FECHA_SCRAPE_LEGACY))
+
+def filas_nuevas(df, links_vistos, desde):
+    """
+    Máscara de las filas que el modelo base NO vio. Como los scrapers
+    re-recorren todos los avisos, lo nuevo se define por Link (huellas
+    guardadas en el registro) y no por fecha. Las filas sin Link (o un
+    modelo base sin huellas) usan la fecha: scrapeadas después de `desde`.
+    """
+    por_fecha = df['Fecha_scrape'] > desde
+    if not links_vistos:
+        return por_fecha
+    huellas = registro_modelos.huellas_de_links(df['Link'])
+    return (huellas.notna() & ~huellas.isin(links_vistos)) | (huellas.isna() & por_fecha)
+
+def pesos_por_antiguedad(fechas, fecha_referencia=None):
+    """
+    Peso de cada fila según su antigüedad (decaimiento exponencial).
+    Así los precios de regímenes cambiarios viejos influyen cada vez menos.
+    """
+    if fecha_referencia is None:
+        fecha_referencia = fechas.max()
+    edad_dias = (fecha_referencia - fechas).dt.days.clip(lower=0).to_numpy()
+    return 0.5 ** (edad_dias / VIDA_MEDIA_DIAS)
+
+def limpiar_moneda(texto, es_remax=True):
+    """
+    Limpia la columna de precio para CUALQUIER formato.
+    Devuelve el monto en su moneda original: la conversión de USD a ARS
+    se hace después, vectorizada, con la tasa de la fecha de scrape.
+    """
+    # Celda numérica de Excel (594.0): ya es el número. Pasarla por str()
+    # y quitar el "." la multiplicaba por 10 (594.0 -> "5940"). La moneda
+    # es desconocida: la regla 'sin_moneda' de calidad_datos.py la aparta
+    if isinstance(texto, numbers.Number):
+        return None if pd.isna(texto) else float(texto)
     texto = str(texto).lower()
     if "no dispor" in texto or "consultar" in texto:
         return None
@@ -50,14 +134,13 @@ def limpiar_moneda(texto, tasa_dolar, es_remax=True):
 
     valor = pd.to_numeric(valor_str, errors='coerce')
     if pd.isna(valor): return None
-        
-    if "usd" in texto:
-        return valor * tasa_dolar
-    else:
-        return valor
+    return valor
 
 def limpiar_expensas(texto):
     """Limpia expensas de CUALQUIER formato"""
+    # Celda numérica de Excel (230000.0): se usa tal cual (ver limpiar_moneda)
+    if isinstance(texto, numbers.Number):
+        return 0 if pd.isna(texto) else float(texto)
     texto = str(texto).lower()
     if "no disponible" in texto or "+" in texto: # Argenprop a veces solo pone "+"
         return 0
@@ -72,66 +155,97 @@ def limpiar_expensas(texto):
     return 0
 
 
-def cargar_y_limpiar_datos(archivo_remax, archivo_argenprop):
-    print("Cargando y limpiando datos...")
-    dataframes_limpios = []
+def fecha_de_archivo(archivo):
+    """Fecha de un snapshot a partir del nombre (..._AAAAMMDD.xlsx), o None."""
+    match = re.search(r'_(\d{8})\.xlsx$', os.path.basename(archivo))
+    return pd.to_datetime(match.group(1), format='%Y%m%d', errors='coerce') if match else None
 
-    # --- 1. PROCESAR REMAX ---
-    if os.path.exists(archivo_remax):
-        print(f"Cargando Remax: {archivo_remax}")
-        df_remax = pd.read_excel(archivo_remax)
-        
-        # Limpieza de Moneda
-        df_remax['Precio_ARS'] = df_remax['Precio'].apply(lambda x: limpiar_moneda(x, TASA_CAMBIO_DOLAR, es_remax=True))
-        df_remax['Expensas_ARS'] = df_remax['Expensas'].apply(limpiar_expensas)
-        
-        # Limpieza de Numéricos
-        cols_numericas_remax = ['M2 cubierta', 'Ambientes', 'Dormitorios', 'Baños', 'Cocheras', 'Antiguedad']
-        for col in cols_numericas_remax:
-            df_remax[col] = pd.to_numeric(df_remax[col], errors='coerce')
-        
-        # Renombrar para consistencia
-        df_remax = df_remax.rename(columns={'M2 cubierta': 'M2_cubierta'})
-        
-        # Seleccionar solo las columnas que nos importan
-        # NOTA: Remax no tiene "M2 total" ni "Cocheras" en esta versión
-        columnas_remax = [
-            'Barrio', 'Precio_ARS', 'Expensas_ARS', 'M2_cubierta', 'Ambientes',
-            'Dormitorios', 'Baños', 'Antiguedad'
-        ]
-        df_remax_final = df_remax[columnas_remax].copy()
-        dataframes_limpios.append(df_remax_final)
-        print(f"Remax procesado: {len(df_remax_final)} filas.")
-    else:
-        print(f"Advertencia: No se encontró el archivo {archivo_remax}")
 
-    # --- 2. PROCESAR ARGENPROP ---
-    if os.path.exists(archivo_argenprop):
-        print(f"Cargando Argenprop: {archivo_argenprop}")
-        df_argen = pd.read_excel(archivo_argenprop)
-        
-        # Limpieza de Moneda
-        df_argen['Precio_ARS'] = df_argen['Precio'].apply(lambda x: limpiar_moneda(x, TASA_CAMBIO_DOLAR, es_remax=False))
-        df_argen['Expensas_ARS'] = df_argen['Expensas'].apply(limpiar_expensas)
-
-        # Renombrar para consistencia
-        df_argen = df_argen.rename(columns={'M2 cubierta': 'M2_cubierta'})
-
-        # Limpieza de Numéricos
-        cols_numericas_argen = ['M2_cubierta', 'Ambientes', 'Dormitorios', 'Baños', 'Antiguedad']
-        for col in cols_numericas_argen:
-            df_argen[col] = pd.to_numeric(df_argen[col], errors='coerce')
-
-        # Seleccionar solo las columnas que nos importan
-        columnas_argen = [
-            'Barrio', 'Precio_ARS', 'Expensas_ARS', 'M2_cubierta', 'Ambientes',
-            'Dormitorios', 'Baños', 'Antiguedad'
-        ]
-        df_argen_final = df_argen[columnas_argen].copy()
-        dataframes_limpios.append(df_argen_final)
-        print(f"Argenprop procesado: {len(df_argen_final)} filas.")
-    else:
-        print(f"Advertencia: No se encontró el archivo {archivo_argenprop}")
+def listar_fuentes(patrones=PATRONES_FUENTES):
+    """Devuelve [(archivo, fuente), ...] con todos los Excel que matchean los patrones."""
+    fuentes = []
+    for fuente, lista_patrones in patrones.items():
+        for patron in lista_patrones:
+            for archivo in sorted(glob.glob(patron)):
+                nombre = os.path.basename(archivo)
+                if nombre.startswith('~$') or nombre in ARCHIVOS_EXCLUIDOS:  # ~$: temporales de Excel abiertos
+                    continue
+                fuentes.append((archivo, fuente))
+    return fuentes
+
+
+def cargar_fuente(archivo, fuente, links_vistos=None, desde=None):
+    """
+    Lee UN archivo (solo las columnas de COLUMNAS_ORIGEN) y aplica la
+    limpieza de su fuente. Corre dentro de un proceso del pool, así que
+    devuelve un DataFrame ya tipado y chico para mandar de vuelta, con las
+    columnas 'falla:...' de las reglas de calidad.
+    Con `desde` (modo incremental) se descartan ANTES de limpiar las filas
+    que el modelo base ya vio (ver filas_nuevas).
+    """
+    df = pd.read_excel(archivo, usecols=lambda col: col in COLUMNAS_ORIGEN)
+    faltantes = [col for col in COLUMNAS_REQUERIDAS if col not in df.columns]
+    if faltantes:
+        print(f"Advertencia: '{archivo}' no tiene las columnas {faltantes}. Se ignora.")
+        return None
+
+    df['Fecha_scrape'] = fecha_de_scrape(df, archivo)
+    if 'Link' not in df.columns:
+        df['Link'] = pd.NA
+    if desde is not None:
+        df = df[filas_nuevas(df, links_vistos, desde)].reset_index(drop=True)
+    calidad_datos.aplicar_normalizaciones(df)
+    df_crudo = df[COLUMNAS_REQUERIDAS].copy()
+
+    # Limpieza de Moneda (Remax y Argenprop escriben el precio distinto)
+    precio = df['Precio'].apply(lambda x: limpiar_moneda(x, es_remax=(fuente == 'remax')))
+    expensas = df['Expensas'].apply(limpiar_expensas)
+    # USD -> ARS con la tasa vigente el día del scrape (join as-of)
+    df['Precio_ARS'] = convertir_a_ars(precio, es_en_dolares(df['Precio']), df['Fecha_scrape'])
+    df['Expensas_ARS'] = convertir_a_ars(expensas, es_en_dolares(df['Expensas']), df['Fecha_scrape'])
+
+    # Renombrar para consistencia
+    df = df.rename(columns={'M2 cubierta': 'M2_cubierta'})
+
+    # Limpieza de Numéricos
+    for col in ['M2_cubierta', 'Ambientes', 'Dormitorios', 'Baños', 'Antiguedad']:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    df['Fuente'] = os.path.basename(archivo)
+
+    fallas = calidad_datos.evaluar_reglas(df_crudo, df)
+    return pd.concat([df[['Link', 'Fuente'] + COLUMNAS_FINALES + ['Fecha_scrape']], fallas], axis=1)
+
+
+def cargar_y_limpiar_datos(fuentes=None, max_workers=None, links_vistos=None, desde=None, limites=None):
+    """
+    Carga y limpia todas las fuentes EN PARALELO (un proceso por archivo),
+    así el tiempo total lo marca el archivo más lento y no la suma.
+    `links_vistos`/`desde` se pasan a cargar_fuente (modo incremental).
+    `limites` ({'precio': ..., 'm2': ...}) fija el filtro de outliers; si
+    no se pasa, se calcula con el percentil 99. Los límites usados quedan en
+    df.attrs['limites_outliers'].
+    """
+    print("Cargando y limpiando datos...")
+    if fuentes is None:
+        fuentes = listar_fuentes()
+    if not fuentes:
+        print("¡Error! No se encontró ningún archivo de datos.")
+        return None
+
+    dataframes_limpios = []
+    workers = min(len(fuentes), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = {pool.submit(cargar_fuente, archivo, fuente, links_vistos, desde): archivo
+                   for archivo, fuente in fuentes}
+        for futuro, archivo in futuros.items():
+            try:
+                df_fuente = futuro.result()
+            except Exception as e:
+                print(f"Advertencia: No se pudo cargar '{archivo}': {e}")
+                continue
+            if df_fuente is not None:
+                dataframes_limpios.append(df_fuente)
+                print(f"{archivo} procesado: {len(df_fuente)} filas.")
 
     # --- 3. COMBINAR DATAFRAMES ---
     if not dataframes_limpios:
@@ -139,14 +253,43 @@ def cargar_y_limpiar_datos(archivo_remax, archivo_argenprop):
         return None
         
     df_combinado = pd.concat(dataframes_limpios, ignore_index=True)
+
+    # Validación: separa las filas con datos basura en vez de dejar que
+    # terminen como NaN -> 0 en el fillna del final (antes de deduplicar, así
+    # de un aviso repetido sobrevive la copia válida)
+    total_filas = len(df_combinado)
+    # Todo lo leído cuenta como "visto" (también lo que va a cuarentena o se
+    # filtra): si no, el próximo incremental lo volvería a limpiar cada vez
+    links_leidos = registro_modelos.huellas_de_links(df_combinado['Link']).dropna().unique()
+    fuentes_totales = df_combinado['Fuente'].value_counts()
+    df_combinado, df_cuarentena, resumen = calidad_datos.separar_cuarentena(df_combinado)
+    calidad_datos.imprimir_resumen(resumen, total_filas, len(df_cuarentena))
+    calidad_datos.avisar_fuentes_en_cuarentena(fuentes_totales, df_cuarentena)
+    if len(df_cuarentena):
+        try:
+            df_cuarentena.to_csv(ARCHIVO_CUARENTENA, index=False)
+            print(f"Filas en cuarentena guardadas en '{ARCHIVO_CUARENTENA}'.")
+        except Exception as e:
+            print(f"No se pudo guardar la cuarentena: {e}")
+
+    # Un mismo aviso puede venir en varios snapshots del mismo día (ej. el
+    # Excel de Argenprop re-scrapeado con amenities): se deja uno solo
+    con_link = df_combinado['Link'].notna()
+    duplicados = con_link & df_combinado.duplicated(subset=['Link', 'Fecha_scrape'], keep='last')
+    if duplicados.any():
+        print(f"Eliminando {duplicados.sum()} filas duplicadas (mismo link y fecha).")
+        df_combinado = df_combinado[~duplicados]
     
     # --- 4. LIMPIEZA FINAL COMBINADA ---
     # Eliminar filas donde falten datos esenciales
     df_combinado = df_combinado.dropna(subset=['Precio_ARS', 'Barrio', 'M2_cubierta', 'Ambientes'])
     
-    # Filtro de Outliers (Valores Atípicos)
-    limite_precio = df_combinado['Precio_ARS'].quantile(0.99)
-    limite_m2 = df_combinado['M2_cubierta'].quantile(0.99)
+    # Filtro de Outliers (Valores Atípicos). En modo incremental se usan los
+    # límites del modelo base: el percentil 99 de un delta chico no sirve
+    if limites is None:
+        limites = {'precio': float(df_combinado['Precio_ARS'].quantile(0.99)),
+                   'm2': float(df_combinado['M2_cubierta'].quantile(0.99))}
+    limite_precio, limite_m2 = limites['precio'], limites['m2']
     
     print(f"Filtrando outliers... Límite de precio: ${limite_precio:,.0f} | Límite M2: {limite_m2} m²")
     df_combinado = df_combinado[
@@ -155,7 +298,9 @@ def cargar_y_limpiar_datos(archivo_remax, archivo_argenprop):
     ]
     
     # Rellenar con 0 el resto de campos (Cocheras, Antiguedad, etc. si faltan)
-    df_combinado = df_combinado.fillna(0)
+    df_combinado[COLUMNAS_FINALES] = df_combinado[COLUMNAS_FINALES].fillna(0)
+    df_combinado.attrs['limites_outliers'] = limites
+    df_combinado.attrs['links_leidos'] = links_leidos
 
     print(f"Limpieza completa. Total de {len(df_combinado)} propiedades válidas para entrenar.")
     return df_combinado
@@ -185,33 +330,187 @@ def entrenar_modelo(df):
         RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
     )
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    X_train, X_test, y_train, y_test, fechas_train, _ = train_test_split(
+        X, y, df['Fecha_scrape'], test_size=0.2, random_state=42
+    )
     
-    model.fit(X_train, y_train)
+    model.fit(X_train, y_train, randomforestregressor__sample_weight=pesos_por_antiguedad(fechas_train))
+
+    # Cada árbol recuerda la fecha más nueva de los datos con que se entrenó
+    # (lo usa el modo incremental para retirar árboles viejos)
+    fecha_datos = df['Fecha_scrape'].max().strftime('%Y-%m-%d')
+    model[-1].fechas_arboles_ = [fecha_datos] * len(model[-1].estimators_)
     
     score = model.score(X_test, y_test)
     print(f"\n--- ¡Modelo Entrenado! ---")
     print(f"Puntaje de Precisión (R-cuadrado): {score:.2f}")
 
-    return model
+    # Costo de pedir el rango de precio (cuantiles por árbol) vs. predict normal
+    latencias = {}
+    for tamanio_lote in (1, len(X_test)):
+        latencia = medir_latencia(model, X_test.head(tamanio_lote))
+        latencias[tamanio_lote] = latencia
+        print(f"Latencia ({latencia['filas']} filas): predict {latencia['predict_ms']:.1f} ms | "
+              f"con rango {latencia['rango_ms']:.1f} ms (+{latencia['sobrecosto_ms']:.1f} ms)")
+
+    # 'conjunto_test' y 'huella_test' dicen sobre qué filas se midió el R2:
+    # solo son comparables versiones con el mismo conjunto
+    metricas = {'r2': score, 'filas_test': len(X_test), 'conjunto_test': 'completo',
+                'huella_test': registro_modelos.huella_de_datos(pd.concat([X_test, y_test], axis=1))}
+    # Para el registro se guarda la latencia de una sola propiedad (caso del formulario)
+    return model, metricas, latencias[1]
+
+# 3. --- ENTRENAMIENTO INCREMENTAL (warm_start) ---
+def entrenar_incremental(model, df_nuevo):
+    """
+    Agrega ARBOLES_POR_INCREMENTO árboles ajustados SOLO sobre las filas
+    nuevas (el costo depende del delta, no de todo el histórico) y retira
+    los árboles más viejos que VENTANA_DIAS o que superen MAX_ARBOLES.
+    El OneHotEncoder no se reajusta: barrios nuevos se ignoran hasta el
+    próximo entrenamiento completo.
+    Si el retiro dejaría el bosque más chico que el modelo base (el delta
+    está a más de VENTANA_DIAS de la base), no se entrena y se devuelve
+    (None, None, None): en ese caso corresponde un entrenamiento completo.
+    """
+    print(f"Iniciando entrenamiento incremental con {len(df_nuevo)} filas nuevas...")
+    preprocesador = model[:-1]
+    bosque = model[-1]
+    arboles_base = len(bosque.estimators_)
+    # Modelos entrenados antes de guardar fechas: se asume que sus árboles
+    # son tan recientes como el comienzo de los datos nuevos
+    fecha_desconocida = df_nuevo['Fecha_scrape'].min().strftime('%Y-%m-%d')
+    fechas_arboles = list(getattr(bosque, 'fechas_arboles_', [fecha_desconocida] * arboles_base))
+
+    # 0. Antes de ajustar nada: ¿cuántos árboles quedarían después del retiro?
+    fecha_datos = df_nuevo['Fecha_scrape'].max().strftime('%Y-%m-%d')
+    limite = (pd.Timestamp(fecha_datos) - pd.Timedelta(days=VENTANA_DIAS)).strftime('%Y-%m-%d')
+    sobreviven_base = sum(fecha >= limite for fecha in fechas_arboles)
+    total_esperado = min(sobreviven_base + ARBOLES_POR_INCREMENTO, MAX_ARBOLES)
+    if total_esperado < arboles_base:
+        print(f"\n*** El retiro por ventana ({VENTANA_DIAS} días) dejaría {total_esperado} árboles "
+              f"(el modelo base tiene {arboles_base}): {arboles_base - sobreviven_base} árboles base "
+              f"son anteriores a {limite}. ***")
+        print("El modelo NO se actualizará. Corre un entrenamiento completo (sin --incremental).")
+        return None, None, None
+
+    X = df_nuevo[FEATURES_MODELO]
+    y = df_nuevo['Precio_ARS']
+    X_train, X_test, y_train, y_test, fechas_train, _ = train_test_split(
+        X, y, df_nuevo['Fecha_scrape'], test_size=0.2, random_state=42
+    )
+
+    # El R2 se mide sobre el test del delta, que no es el del modelo base:
+    # para compararlos, se mide también el base (antes de tocarlo) sobre ese test
+    score_base = model.score(X_test, y_test)
+
+    # 1. Agregar árboles nuevos (warm_start conserva los existentes)
+    X_train_transformado = preprocesador.transform(X_train)
+    bosque.set_params(warm_start=True, n_estimators=len(bosque.estimators_) + ARBOLES_POR_INCREMENTO)
+    bosque.fit(X_train_transformado, y_train, sample_weight=pesos_por_antiguedad(fechas_train))
+    bosque.set_params(warm_start=False)
+    fechas_arboles += [fecha_datos] * ARBOLES_POR_INCREMENTO
+
+    # 2. Retirar árboles viejos (fuera de la ventana o por encima del tope)
+    orden = sorted(range(len(fechas_arboles)), key=lambda i: fechas_arboles[i])  # del más viejo al más nuevo
+    conservar = sorted([i for i in orden if fechas_arboles[i] >= limite][-MAX_ARBOLES:])
+    retirados = len(fechas_arboles) - len(conservar)
+
+    bosque.estimators_ = [bosque.estimators_[i] for i in conservar]
+    bosque.n_estimators = len(bosque.estimators_)
+    bosque.fechas_arboles_ = [fechas_arboles[i] for i in conservar]
+
+    score = model.score(X_test, y_test)
+    print(f"\n--- ¡Modelo Actualizado! ---")
+    print(f"Árboles agregados: {ARBOLES_POR_INCREMENTO} | retirados: {retirados} | total: {bosque.n_estimators}")
+    print(f"Puntaje de Precisión sobre datos nuevos (R-cuadrado): {score:.2f} (modelo base: {score_base:.2f})")
+
+    latencia = medir_latencia(model, X_test.head(1))
+    metricas = {'r2': score, 'filas_test': len(X_test), 'arboles_retirados': retirados,
+                'conjunto_test': 'delta', 'r2_base': score_base,
+                'huella_test': registro_modelos.huella_de_datos(pd.concat([X_test, y_test], axis=1))}
+    return model, metricas, latencia
 
 # --- EJECUCIÓN PRINCIPAL PARA ENTRENAR Y GUARDAR ---
 if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Entrena el modelo de alquiler y lo registra.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Agrega árboles entrenados solo con las filas nuevas (warm_start).")
+    parser.add_argument('--base', default=None,
+                        help="Versión sobre la que se entrena en modo incremental (por defecto, el champion).")
+    args = parser.parse_args()
     
     print("--- INICIANDO SCRIPT DE ENTRENAMIENTO COMBINADO (Remax + Argenprop) ---")
     
-    df_limpio = cargar_y_limpiar_datos(ARCHIV_REMAX, ARCHIV_ARGENPROP)
+    fuentes = listar_fuentes()
+    filtro_incremental = {}
+    links_vistos = set()
+    modelo_base = None
+    modelo_entrenado = None
+    extra = {'modo': 'completo'}
+
+    if args.incremental:
+        version_base = args.base or registro_modelos.version_actual('champion')
+        if version_base is None:
+            print("\n*** ERROR: No hay modelo base en el registro. Corre primero un entrenamiento completo. ***")
+        else:
+            try:
+                modelo_base, metadata_base = registro_modelos.cargar_version(version_base)
+            except FileNotFoundError:
+                print(f"\n*** ERROR: No existe la versión '{version_base}' en el registro. "
+                      f"Mira las disponibles con: python registro_modelos.py listar ***")
+        if modelo_base is not None:
+            fecha_max_base = pd.Timestamp(metadata_base.get('fecha_max_datos', '1970-01-01'))
+            links_vistos = set(metadata_base.get('links_vistos', []))
+            # Los snapshots anteriores a los datos del base ya los vio entero:
+            # ni se abren (el del mismo día sí, pudo reescribirse después)
+            fuentes = [(archivo, fuente) for archivo, fuente in fuentes
+                       if fecha_de_archivo(archivo) is None or fecha_de_archivo(archivo) >= fecha_max_base]
+            filtro_incremental = {'links_vistos': links_vistos, 'desde': fecha_max_base,
+                                  'limites': metadata_base.get('limites_outliers')}
+            print(f"Modelo base: {version_base} (datos hasta {fecha_max_base.date()}, "
+                  f"{len(links_vistos)} links vistos). Se leen {len(fuentes)} archivos.")
+
+    df_limpio = None
+    if not args.incremental or modelo_base is not None:
+        df_limpio = cargar_y_limpiar_datos(fuentes, **filtro_incremental)
+    df_entrenamiento = df_limpio
     
-    if df_limpio is None or len(df_limpio) < 50:
+    if args.incremental:
+        # En modo incremental df_limpio ya es solo lo que el base no vio
+        if df_limpio is not None and len(df_limpio) < MIN_FILAS_INCREMENTO:
+            print(f"\n*** Hay menos de {MIN_FILAS_INCREMENTO} filas nuevas. El modelo NO se actualizará. ***")
+        elif df_limpio is not None:
+            modelo_entrenado, metricas, latencia = entrenar_incremental(modelo_base, df_entrenamiento)
+            extra = {'modo': 'incremental', 'version_base': version_base}
+    elif df_limpio is None or len(df_limpio) < 50:
         print("\n*** ADVERTENCIA: No hay suficientes datos (menos de 50) para un modelo confiable. ***")
         print("El modelo NO se guardará.")
     else:
-        modelo_entrenado = entrenar_modelo(df_limpio)
+        modelo_entrenado, metricas, latencia = entrenar_modelo(df_limpio)
         
+    if modelo_entrenado is not None:
         try:
-            joblib.dump(modelo_entrenado, 'modelo_alquiler.pkl')
-            print("\n--- ¡ÉXITO! Modelo guardado como 'modelo_alquiler.pkl' ---")
-            print("El modelo ahora está entrenado con AMBOS datasets.")
-            print("Ya puedes ejecutar 'app.py' para iniciar la calculadora web (¡recuerda actualizarlo!).")
+            # Cada entrenamiento es una versión nueva; nunca se pisa un modelo anterior
+            fecha_max = df_entrenamiento['Fecha_scrape'].max()
+            if modelo_base is not None:
+                fecha_max = max(fecha_max, fecha_max_base)  # un delta de links viejos no la atrasa
+            extra['fecha_max_datos'] = fecha_max.strftime('%Y-%m-%d')
+            extra['n_arboles'] = len(modelo_entrenado[-1].estimators_)
+            extra['limites_outliers'] = df_limpio.attrs['limites_outliers']
+            # Links ya vistos (los del base + los leídos ahora): el próximo
+            # incremental solo agrega árboles para los que no estén acá
+            extra['links_vistos'] = sorted(links_vistos | set(df_limpio.attrs['links_leidos']))
+            version = registro_modelos.registrar_modelo(modelo_entrenado, df_entrenamiento, metricas, latencia, extra)
+            print(f"\n--- ¡ÉXITO! Modelo registrado como versión '{version}' ---")
+
+            if registro_modelos.version_actual('champion') is None:
+                registro_modelos.promover(version, 'champion')
+                print("No había champion: esta versión queda como champion.")
+            else:
+                # La versión nueva se evalúa en sombra antes de promoverla
+                registro_modelos.promover(version, 'challenger')
+                print("La versión quedó como challenger (app.py la evalúa en sombra).")
+                print(f"Para promoverla: python registro_modelos.py promover {version}")
         except Exception as e:
-            print(f"\n*** ERROR AL GUARDAR EL MODELO: {e} ***")
\ No newline at end of file
+            print(f"\n*** ERROR AL GUARDAR EL MODELO: {e} ***")
@@ -0,0 +1,175 @@
+import os
+import io
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+
+# ===================================================================
+# --- CONFIGURACIÓN DEL PERFILADO (opcional) ---
+# ===================================================================
+#   PERFILAR=1                    -> mide cada fase por link y guarda el reporte
+#   PERFILAR_PARSEO=cprofile      -> además perfila el parseo con cProfile
+#   PERFILAR_PARSEO=pyinstrument  -> ídem con pyinstrument (si está instalado)
+PERFILAR = os.environ.get('PERFILAR', '0') == '1'
+PERFILAR_PARSEO = os.environ.get('PERFILAR_PARSEO', '').lower()
+DIR_REPORTES = 'reportes_perfilado'
+PERCENTILES = [0.5, 0.9, 0.99]
+
+
+class Perfilador:
+    """
+    Junta tiempos por fase (driver.get, WebDriverWait, sleep, parseo,
+    extracción...) y bytes descargados para cada link. Si está inactivo,
+    todos los métodos son casi gratis.
+    """
+
+    def __init__(self, nombre, activo=PERFILAR, perfil_parseo=PERFILAR_PARSEO):
+        self.nombre = nombre
+        self.activo = activo
+        self.registros = []
+        self._actual = None
+        self._inicio_corrida = time.perf_counter()
+        self._perfil_parseo = None
+        self._tipo_perfil_parseo = None
+
+        if self.activo and perfil_parseo == 'cprofile':
+            import cProfile
+            self._perfil_parseo = cProfile.Profile()
+            self._tipo_perfil_parseo = 'cprofile'
+        elif self.activo and perfil_parseo == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+                self._perfil_parseo = Profiler()
+                self._tipo_perfil_parseo = 'pyinstrument'
+            except ImportError:
+                print("Advertencia: pyinstrument no está instalado. Se perfila sin él.")
+
+    # --- Registro por link ---
+
+    def iniciar_link(self, link, etapa='detalle'):
+        """Empieza a medir un link (si había otro abierto, lo cierra)."""
+        if not self.activo:
+            return
+        self.terminar_link()
+        self._actual = {'link': link, 'etapa': etapa, 'ok': True, 'bytes': 0, '_inicio': time.perf_counter()}
+
+    def terminar_link(self):
+        if not self.activo or self._actual is None:
+            return
+        registro = self._actual
+        registro['total'] = time.perf_counter() - registro.pop('_inicio')
+        self.registros.append(registro)
+        self._actual = None
+
+    def marcar_error(self, error):
+        if self.activo and self._actual is not None:
+            self._actual['ok'] = False
+            self._actual['error'] = str(error)[:200]
+
+    def sumar_bytes(self, texto):
+        """Suma el tamaño (en bytes UTF-8) del HTML descargado."""
+        if self.activo and self._actual is not None:
+            self._actual['bytes'] += len(texto.encode('utf-8'))
+
+    @contextmanager
+    def fase(self, nombre_fase):
+        """Mide el bloque y lo acumula en la fase del link actual."""
+        if not self.activo or self._actual is None:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._actual[nombre_fase] = self._actual.get(nombre_fase, 0.0) + (time.perf_counter() - inicio)
+
+    @contextmanager
+    def parseo(self):
+        """Fase 'parseo' (BeautifulSoup) + captura opcional con cProfile/pyinstrument."""
+        with self.fase('parseo'):
+            if self._perfil_parseo is None:
+                yield
+                return
+            if self._tipo_perfil_parseo == 'cprofile':
+                self._perfil_parseo.enable()
+            else:
+                self._perfil_parseo.start()
+            try:
+                yield
+            finally:
+                if self._tipo_perfil_parseo == 'cprofile':
+                    self._perfil_parseo.disable()
+                else:
+                    self._perfil_parseo.stop()  # pyinstrument combina las sesiones sucesivas
+
+    # --- Reporte ---
+
+    def resumen(self):
+        """Tabla por fase: cantidad, total, media y percentiles (en segundos)."""
+        df = pd.DataFrame(self.registros)
+        columnas_meta = {'link', 'etapa', 'ok', 'error', 'bytes'}
+        fases = [col for col in df.columns if col not in columnas_meta]
+        filas = []
+        for etapa, grupo in df.groupby('etapa'):
+            for fase in fases:
+                valores = grupo[fase].dropna()
+                if valores.empty:
+                    continue
+                fila = {'etapa': etapa, 'fase': fase, 'n': len(valores),
+                        'total_s': valores.sum(), 'media_s': valores.mean()}
+                for p in PERCENTILES:
+                    fila[f"p{int(p * 100)}_s"] = valores.quantile(p)
+                fila['max_s'] = valores.max()
+                filas.append(fila)
+        return pd.DataFrame(filas)
+
+    def guardar_reporte(self):
+        """Escribe el JSON (detalle + resumen), la tabla en .txt y, si hay, el perfil del parseo."""
+        if not self.activo:
+            return None
+        if not self.registros:
+            print("Perfilado: no hay links registrados, no se guarda reporte.")
+            return None
+
+        os.makedirs(DIR_REPORTES, exist_ok=True)
+        base = os.path.join(DIR_REPORTES, f"{self.nombre}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        df = pd.DataFrame(self.registros)
+        resumen = self.resumen()
+
+        reporte = {
+            'scraper': self.nombre,
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'duracion_total_s': time.perf_counter() - self._inicio_corrida,
+            'links': len(df),
+            'links_con_error': int((~df['ok']).sum()),
+            'bytes_total': int(df['bytes'].sum()),
+            'resumen_por_fase': resumen.to_dict(orient='records'),
+            'links_detalle': json.loads(df.to_json(orient='records')),
+        }
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+
+        tabla = resumen.sort_values('total_s', ascending=False).to_string(index=False, float_format=lambda x: f"{x:.3f}")
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            f.write(tabla + "\n")
+
+        print(f"\n--- Perfilado ({self.nombre}): {reporte['links']} links, "
+              f"{reporte['bytes_total'] / 1e6:.1f} MB, {reporte['duracion_total_s']:.0f} s ---")
+        print(tabla)
+        print(f"Reporte guardado en '{base}.json' y '{base}.txt'")
+
+        if self._tipo_perfil_parseo == 'cprofile':
+            import pstats
+            self._perfil_parseo.dump_stats(f"{base}_parseo.prof")
+            salida = io.StringIO()
+            pstats.Stats(self._perfil_parseo, stream=salida).sort_stats('cumulative').print_stats(25)
+            with open(f"{base}_parseo.txt", 'w', encoding='utf-8') as f:
+                f.write(salida.getvalue())
+            print(f"Perfil del parseo (cProfile) en '{base}_parseo.prof'")
+        elif self._tipo_perfil_parseo == 'pyinstrument' and self._perfil_parseo.last_session is not None:
+            with open(f"{base}_parseo.html", 'w', encoding='utf-8') as f:
+                f.write(self._perfil_parseo.output_html())
+            print(f"Perfil del parseo (pyinstrument) en '{base}_parseo.html'")
+        return reporte
@@ -0,0 +1,102 @@
+import time
+import weakref
+import numpy as np
+import pandas as pd
+
+# ===================================================================
+# --- CONFIGURACIÓN DE RANGOS DE PRECIO ---
+# ===================================================================
+# Cuantiles (sobre las predicciones de cada árbol) que definen el rango
+CUANTIL_INFERIOR = 0.10
+CUANTIL_SUPERIOR = 0.90
+
+# Columnas que espera el modelo (mismo orden que en el entrenamiento)
+FEATURES_MODELO = [
+    'M2_cubierta', 'Ambientes', 'Dormitorios',
+    'Baños', 'Antiguedad', 'Expensas_ARS', 'Barrio'
+]
+
+# Cache de las hojas de cada bosque (se arma una sola vez por modelo).
+# Es débil: cuando app.py recarga un modelo, el bosque viejo se libera.
+_CACHE_HOJAS = weakref.WeakKeyDictionary()
+
+
+def _tabla_de_hojas(bosque):
+    """
+    Concatena los valores de TODOS los nodos de TODOS los árboles en un
+    único array y guarda el offset donde empieza cada árbol.
+    Así, con los índices de hoja de `apply`, se obtienen las predicciones
+    de los 100 árboles con una sola indexación de numpy.
+    """
+    arboles = bosque.estimators_
+    # Si el entrenamiento incremental agregó/retiró árboles cambia la
+    # cantidad o el primer/último árbol: en ese caso se rearma la tabla
+    firma = (len(arboles), id(arboles[0]), id(arboles[-1]))
+    en_cache = _CACHE_HOJAS.get(bosque)
+    if en_cache is None or en_cache[0] != firma:
+        valores = [arbol.tree_.value[:, 0, 0] for arbol in arboles]
+        tamanios = np.array([len(v) for v in valores])
+        offsets = np.concatenate(([0], np.cumsum(tamanios)[:-1]))
+        en_cache = (firma, np.concatenate(valores), offsets)
+        _CACHE_HOJAS[bosque] = en_cache
+    return en_cache[1], en_cache[2]
+
+
+def predicciones_por_arbol(modelo, X):
+    """
+    Devuelve una matriz (n_propiedades, n_arboles) con la predicción de
+    cada árbol, en una sola pasada:
+      1. El preprocesamiento (OneHot) se aplica UNA vez.
+      2. `apply` obtiene la hoja de cada árbol (en paralelo, n_jobs del bosque).
+      3. Los valores se leen de la tabla concatenada con indexación vectorizada.
+    """
+    preprocesador = modelo[:-1]
+    bosque = modelo[-1]
+
+    X_transformado = preprocesador.transform(X[FEATURES_MODELO])
+    hojas = bosque.apply(X_transformado)  # (n_propiedades, n_arboles)
+
+    valores, offsets = _tabla_de_hojas(bosque)
+    return valores[hojas + offsets]
+
+
+def predecir_con_rango(modelo, X, cuantil_inferior=CUANTIL_INFERIOR, cuantil_superior=CUANTIL_SUPERIOR):
+    """
+    Predice el precio (promedio de los árboles, igual que `predict`) y un
+    rango [inferior, superior] usando cuantiles sobre los árboles.
+    Sirve tanto para una sola propiedad como para un lote.
+    """
+    por_arbol = predicciones_por_arbol(modelo, X)
+
+    resultado = pd.DataFrame(index=X.index)
+    resultado['Precio_ARS'] = por_arbol.mean(axis=1)
+    resultado['Precio_min_ARS'], resultado['Precio_max_ARS'] = np.quantile(
+        por_arbol, [cuantil_inferior, cuantil_superior], axis=1
+    )
+    return resultado
+
+
+def medir_latencia(modelo, X, repeticiones=20):
+    """
+    Compara la latencia (en milisegundos, mediana) de `predict` contra
+    `predecir_con_rango` sobre el mismo lote.
+    """
+    X = X[FEATURES_MODELO]
+    predecir_con_rango(modelo, X)  # calentar la cache de hojas
+
+    def _mediana_ms(funcion):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion(X)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return float(np.median(tiempos))
+
+    ms_predict = _mediana_ms(modelo.predict)
+    ms_rango = _mediana_ms(lambda datos: predecir_con_rango(modelo, datos))
+    return {
+        'filas': len(X),
+        'predict_ms': ms_predict,
+        'rango_ms': ms_rango,
+        'sobrecosto_ms': ms_rango - ms_predict,
+    }
@@ -0,0 +1,188 @@
+import os
+import sys
+import json
+import hashlib
+import tempfile
+from datetime import datetime
+import pandas as pd
+import joblib
+
+# ===================================================================
+# --- CONFIGURACIÓN DEL REGISTRO ---
+# ===================================================================
+# Cada versión se guarda en su propia carpeta: modelos/<version>/
+#   - modelo.pkl     -> el pipeline entrenado
+#   - metadata.json  -> métricas, huella de datos, tamaño y latencia
+# Los "punteros" (champion.json / challenger.json) indican qué versión
+# se sirve. Se reemplazan de forma atómica (os.replace).
+DIR_REGISTRO = 'modelos'
+ARCHIVO_MODELO = 'modelo.pkl'
+ARCHIVO_METADATA = 'metadata.json'
+ROLES = ('champion', 'challenger')
+
+
+def huella_de_datos(df):
+    """Hash (sha256) del contenido del DataFrame de entrenamiento."""
+    hashes_filas = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha256(hashes_filas.tobytes()).hexdigest()
+
+
+def huellas_de_links(links):
+    """
+    Hash (hex de 16 caracteres) de cada link, con NaN donde no hay link.
+    La metadata guarda estas huellas y no los links (ocupan menos y alcanzan
+    para saber qué avisos ya vio un modelo).
+    """
+    links = pd.Series(links)
+    huellas = pd.util.hash_pandas_object(links.astype(str), index=False).map('{:016x}'.format)
+    return huellas.where(links.notna())
+
+
+def _escribir_atomico(ruta, contenido):
+    """Escribe a un archivo temporal y lo renombra (atómico en el mismo disco)."""
+    directorio = os.path.dirname(ruta) or '.'
+    fd, ruta_tmp = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(contenido)
+        os.replace(ruta_tmp, ruta)
+    except Exception:
+        if os.path.exists(ruta_tmp):
+            os.remove(ruta_tmp)
+        raise
+
+
+def ruta_puntero(rol):
+    if rol not in ROLES:
+        raise ValueError(f"Rol desconocido: '{rol}'. Opciones: {ROLES}")
+    return os.path.join(DIR_REGISTRO, f"{rol}.json")
+
+
+def registrar_modelo(modelo, df_entrenamiento, metricas, latencia=None, extra=None):
+    """
+    Guarda el modelo como una nueva versión (nunca sobrescribe otra) y
+    devuelve el nombre de la versión. `extra` agrega campos a la metadata.
+    """
+    version = datetime.now().strftime('v%Y%m%d_%H%M%S_%f')
+    dir_version = os.path.join(DIR_REGISTRO, version)
+    os.makedirs(dir_version)
+
+    ruta_modelo = os.path.join(dir_version, ARCHIVO_MODELO)
+    joblib.dump(modelo, ruta_modelo)
+
+    metadata = {
+        'version': version,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'metricas': metricas,
+        'huella_datos': huella_de_datos(df_entrenamiento),
+        'filas_entrenamiento': len(df_entrenamiento),
+        'tamanio_bytes': os.path.getsize(ruta_modelo),
+        'latencia': latencia,
+    }
+    if extra:
+        metadata.update(extra)
+    _escribir_atomico(os.path.join(dir_version, ARCHIVO_METADATA),
+                      json.dumps(metadata, indent=2, ensure_ascii=False))
+    return version
+
+
+def leer_metadata(version):
+    with open(os.path.join(DIR_REGISTRO, version, ARCHIVO_METADATA), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def listar_versiones():
+    """Devuelve la metadata de todas las versiones, de la más vieja a la más nueva."""
+    if not os.path.isdir(DIR_REGISTRO):
+        return []
+    versiones = sorted(
+        nombre for nombre in os.listdir(DIR_REGISTRO)
+        if os.path.exists(os.path.join(DIR_REGISTRO, nombre, ARCHIVO_METADATA))
+    )
+    return [leer_metadata(version) for version in versiones]
+
+
+def version_actual(rol='champion'):
+    """Versión a la que apunta el rol, o None si no hay puntero."""
+    ruta = ruta_puntero(rol)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f).get('version')
+
+
+def promover(version, rol='champion'):
+    """
+    Apunta el rol a la versión indicada. El cambio es un único os.replace
+    del archivo puntero, así que app.py nunca ve un estado intermedio.
+    """
+    if not os.path.exists(os.path.join(DIR_REGISTRO, version, ARCHIVO_MODELO)):
+        raise FileNotFoundError(f"No existe la versión '{version}' en '{DIR_REGISTRO}'")
+    puntero = {'version': version, 'fecha': datetime.now().isoformat(timespec='seconds')}
+    _escribir_atomico(ruta_puntero(rol), json.dumps(puntero, indent=2))
+
+    # Si el challenger pasó a champion, ya no tiene sentido compararlo consigo mismo
+    if rol == 'champion' and version_actual('challenger') == version:
+        quitar_puntero('challenger')
+
+
+def quitar_puntero(rol):
+    """Elimina el puntero de un rol (por ej. dejar de evaluar un challenger)."""
+    ruta = ruta_puntero(rol)
+    if os.path.exists(ruta):
+        os.remove(ruta)
+
+
+def cargar_version(version):
+    """Devuelve (modelo, metadata) de una versión puntual."""
+    modelo = joblib.load(os.path.join(DIR_REGISTRO, version, ARCHIVO_MODELO))
+    return modelo, leer_metadata(version)
+
+
+def cargar_modelo(rol='champion'):
+    """Devuelve (modelo, metadata) del rol, o (None, None) si no hay versión."""
+    version = version_actual(rol)
+    if version is None:
+        return None, None
+    return cargar_version(version)
+
+
+def describir_r2(metadata):
+    """
+    R2 con el conjunto de test sobre el que se midió. Un incremental se
+    mide sobre el test del delta (no el del histórico), así que se muestra
+    junto al R2 de su versión base sobre ese MISMO test.
+    """
+    metricas = metadata['metricas']
+    texto = f"{metricas['r2']:.3f} (test: {metricas.get('conjunto_test', 'n/d')}, {metricas.get('filas_test', '?')} filas"
+    if 'r2_base' in metricas:
+        texto += f"; base {metadata.get('version_base')} en el mismo test: {metricas['r2_base']:.3f}"
+    return texto + ")"
+
+
+# ===================================================================
+# --- USO DESDE CONSOLA ---
+#   python registro_modelos.py listar
+#   python registro_modelos.py promover <version> [champion|challenger]
+#   python registro_modelos.py quitar challenger
+# ===================================================================
+if __name__ == "__main__":
+    comando = sys.argv[1] if len(sys.argv) > 1 else 'listar'
+
+    if comando == 'listar':
+        champion, challenger = version_actual('champion'), version_actual('challenger')
+        for meta in listar_versiones():
+            marca = ' (champion)' if meta['version'] == champion else ' (challenger)' if meta['version'] == challenger else ''
+            latencia = (meta.get('latencia') or {}).get('predict_ms')
+            print(f"{meta['version']}{marca} | R2: {describir_r2(meta)} | filas: {meta['filas_entrenamiento']} | "
+                  f"{meta['tamanio_bytes'] / 1e6:.1f} MB | "
+                  f"latencia: {f'{latencia:.1f} ms' if latencia is not None else 'n/d'}")
+    elif comando == 'promover' and len(sys.argv) > 2:
+        rol = sys.argv[3] if len(sys.argv) > 3 else 'champion'
+        promover(sys.argv[2], rol)
+        print(f"Versión '{sys.argv[2]}' promovida a {rol}.")
+    elif comando == 'quitar' and len(sys.argv) > 2:
+        quitar_puntero(sys.argv[2])
+        print(f"Puntero '{sys.argv[2]}' eliminado.")
+    else:
+        print("Uso: python registro_modelos.py [listar | promover <version> [rol] | quitar <rol>]")
@@ -6,6 +6,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import pandas as pd
 import re 
+from perfilado import Perfilador
 
 # ===================================================================
 # --- CONFIGURACIÓN ETAPA 1 (PÁGINA DE BÚSQUEDA) ---
@@ -42,6 +43,9 @@ MAPA_DE_IDS = {
 # --- FIN DE LA CONFIGURACIÓN ---
 # ===================================================================
 
+# --- Perfilado opcional (PERFILAR=1, ver perfilado.py) ---
+perfil = Perfilador('remax')
+
 # --- Configuración de Selenium ---
 try:
     driver = webdriver.Chrome()
@@ -65,23 +69,31 @@ try:
     for page_num in range(MAX_PAGINAS_A_SCRAPEAR):
         url_a_scrapear = f"{URL_PRE_PAGE}page={page_num}{URL_POST_PAGE}"
         print(f"Scrapeando página de búsqueda {page_num}...")
+        perfil.iniciar_link(url_a_scrapear, etapa='busqueda')
         
-        driver.get(url_a_scrapear)
+        with perfil.fase('driver.get'):
+            driver.get(url_a_scrapear)
         
         selector_xpath = f"//div[contains(@class, '{CLASE_TARJETA}')]"
         try:
-            WebDriverWait(driver, TIEMPO_MAX_ESPERA).until(
-                EC.presence_of_element_located((By.XPATH, selector_xpath))
-            )
-            time.sleep(2) 
+            with perfil.fase('espera'):
+                WebDriverWait(driver, TIEMPO_MAX_ESPERA).until(
+                    EC.presence_of_element_located((By.XPATH, selector_xpath))
+                )
+            with perfil.fase('sleep'):
+                time.sleep(2) 
         except Exception as e:
+            perfil.marcar_error(e)
             print(f"No se encontraron tarjetas en página {page_num}.")
             print("Puede ser el final o un error de carga.")
             break 
         
         page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
-        listado_items = soup.find_all('div', class_=lambda c: c and CLASE_TARJETA in c)
+        perfil.sumar_bytes(page_source)
+        with perfil.parseo():
+            soup = BeautifulSoup(page_source, 'html.parser')
+        with perfil.fase('extraccion'):
+            listado_items = soup.find_all('div', class_=lambda c: c and CLASE_TARJETA in c)
         
         if not listado_items:
             print("No se encontraron más items. Terminando Etapa 1.")
@@ -98,7 +110,9 @@ try:
                     links_de_propiedades.append(link_absoluto)
                     
 except Exception as e:
+    perfil.marcar_error(e)
     print(f"Se produjo un error en la Etapa 1: {e}")
+perfil.terminar_link()
 
 print(f"\n--- ETAPA 1 Completa. Se encontraron {len(links_de_propiedades)} links únicos. ---")
 print("--- ETAPA 2: Visitando cada link (esto tardará)... ---")
@@ -177,26 +191,31 @@ def get_data_smarter(soup_detalle, tipo, tipo_selector, selector_o_keyword):
 # !!! --- SIN LÍMITE DE PRUEBA --- !!!
 for i, link in enumerate(links_de_propiedades):
     print(f"Procesando link {i+1}/{len(links_de_propiedades)}: {link}")
+    perfil.iniciar_link(link)
     
     try:
-        driver.get(link)
+        with perfil.fase('driver.get'):
+            driver.get(link)
         
         precio_config = MAPA_DE_IDS["precio"] 
         tipo_selector_espera = precio_config[1]
         selector_espera = precio_config[2]
         
-        if tipo_selector_espera == "id":
-             WebDriverWait(driver, TIEMPO_MAX_ESPERA).until(
-                EC.presence_of_element_located((By.ID, selector_espera))
-            )
-        else: 
-            WebDriverWait(driver, TIEMPO_MAX_ESPERA).until(
-                EC.presence_of_element_located((By.XPATH, f"//*[contains(@class, '{selector_espera}')]"))
-            )
+        with perfil.fase('espera'):
+            if tipo_selector_espera == "id":
+                 WebDriverWait(driver, TIEMPO_MAX_ESPERA).until(
+                    EC.presence_of_element_located((By.ID, selector_espera))
+                )
+            else: 
+                WebDriverWait(driver, TIEMPO_MAX_ESPERA).until(
+                    EC.presence_of_element_located((By.XPATH, f"//*[contains(@class, '{selector_espera}')]"))
+                )
         
         
         page_source_detalle = driver.page_source
-        soup_detalle = BeautifulSoup(page_source_detalle, 'html.parser')
+        perfil.sumar_bytes(page_source_detalle)
+        with perfil.parseo():
+            soup_detalle = BeautifulSoup(page_source_detalle, 'html.parser')
         
         info_propiedad = {'Link': link}
         
@@ -216,10 +235,11 @@ for i, link in enumerate(links_de_propiedades):
             resultado = ""
             
             try:
-                if tipo == "simple":
-                    resultado = get_data_smarter(soup_detalle, tipo, args[0], args[1]) 
-                elif tipo == "amenities" or tipo == "keyword":
-                    resultado = get_data_smarter(soup_detalle, tipo, None, args[0]) 
+                with perfil.fase('get_data_smarter'):
+                    if tipo == "simple":
+                        resultado = get_data_smarter(soup_detalle, tipo, args[0], args[1]) 
+                    elif tipo == "amenities" or tipo == "keyword":
+                        resultado = get_data_smarter(soup_detalle, tipo, None, args[0]) 
                 
                 # Limpieza final
                 if campo in campos_numericos_opcionales:
@@ -236,24 +256,32 @@ for i, link in enumerate(links_de_propiedades):
                 info_propiedad[campo_bonito] = "Error de Script"
                 
         propiedades_encontradas.append(info_propiedad)
-        time.sleep(1.5) # <-- Pausa de cortesía
+        with perfil.fase('sleep'):
+            time.sleep(1.5) # <-- Pausa de cortesía
 
     except Exception as e:
+        perfil.marcar_error(e)
         print(f"  Error procesando {link}: {e}")
         print("  Puede ser un CAPTCHA, un ID/Clase incorrecto en el MAPA, o la página es distinta.")
 
 # --- Cierre y guardado ---
+perfil.terminar_link()
 driver.quit()
 print("\nNavegador cerrado.")
+perfil.guardar_reporte()
 
 if propiedades_encontradas:
     print(f"\n--- Scraping Finalizado ---")
     print(f"Total de propiedades detalladas encontradas: {len(propiedades_encontradas)}")
     df = pd.DataFrame(propiedades_encontradas)
+    df['Fecha_scrape'] = time.strftime('%Y-%m-%d') # <-- Para el reentrenamiento incremental
+    # Un snapshot por día (no se pisa el anterior): así el entrenamiento
+    # conserva la historia de precios y el modo incremental ve qué es nuevo
+    archivo_salida = f"propiedades_remax_{time.strftime('%Y%m%d')}.xlsx"
     
     try:
-        df.to_excel('propiedades_remax_DETALLADO_COMPLETO.xlsx', index=False)
-        print("\n¡ÉXITO! Datos guardados en 'propiedades_remax_DETALLADO_COMPLETO.xlsx'")
+        df.to_excel(archivo_salida, index=False)
+        print(f"\n¡ÉXITO! Datos guardados en '{archivo_salida}'")
     except Exception as e:
         print(f"No se pudo guardar el Excel: {e} (¿Quizás lo tienes abierto?)")
 else:
@@ -0,0 +1,68 @@
+import os
+import numpy as np
+import pandas as pd
+
+# ===================================================================
+# --- CONFIGURACIÓN DEL TIPO DE CAMBIO ---
+# ===================================================================
+# Tabla local (sin red) con columnas: Fecha, ARS_por_USD
+# Cada fila vale desde su fecha hasta la fecha de la fila siguiente.
+ARCHIVO_TASAS = 'tasas_cambio.csv'
+# Si no hay tabla, se usa esta tasa única (comportamiento anterior)
+TASA_CAMBIO_DOLAR = 1430
+
+_cache_tasas = {}
+SIN_TABLA = 'sin_tabla'  # Marca en la cache: el archivo no existe (ya se avisó)
+
+
+def cargar_tasas(archivo=ARCHIVO_TASAS):
+    """
+    Lee la tabla de tasas ordenada por fecha y la deja en cache.
+    Devuelve (fechas, tasas) como arrays de numpy, o None si no existe.
+    """
+    if not os.path.exists(archivo):
+        # Se avisa una sola vez (app.py llama esto en cada pedido en USD)
+        if _cache_tasas.get(archivo) != SIN_TABLA:
+            print(f"Advertencia: No se encontró '{archivo}'. Se usa la tasa fija de {TASA_CAMBIO_DOLAR}.")
+            _cache_tasas[archivo] = SIN_TABLA
+        return None
+    mtime = os.path.getmtime(archivo)
+    en_cache = _cache_tasas.get(archivo)
+    if en_cache is None or en_cache == SIN_TABLA or en_cache[0] != mtime:
+        df_tasas = pd.read_csv(archivo, parse_dates=['Fecha'])
+        df_tasas = df_tasas.dropna(subset=['Fecha', 'ARS_por_USD']).sort_values('Fecha')
+        en_cache = (mtime, df_tasas['Fecha'].to_numpy(dtype='datetime64[ns]'), df_tasas['ARS_por_USD'].to_numpy(dtype=float))
+        _cache_tasas[archivo] = en_cache
+    return en_cache[1], en_cache[2]
+
+
+def tasas_para_fechas(fechas, archivo=ARCHIVO_TASAS):
+    """
+    Join "as-of" vectorizado: para cada fecha devuelve la tasa vigente
+    (la última fila de la tabla con Fecha <= fecha). Es un searchsorted
+    sobre la tabla ordenada, O(n log m), sin ordenar las n filas.
+    Fechas anteriores al inicio de la tabla usan la primera tasa.
+    """
+    fechas = pd.to_datetime(pd.Series(fechas)).to_numpy(dtype='datetime64[ns]')
+    tabla = cargar_tasas(archivo)
+    if tabla is None or len(tabla[0]) == 0:
+        return np.full(len(fechas), float(TASA_CAMBIO_DOLAR))
+
+    fechas_tabla, tasas_tabla = tabla
+    posiciones = np.searchsorted(fechas_tabla, fechas, side='right') - 1
+    return tasas_tabla[np.clip(posiciones, 0, len(tasas_tabla) - 1)]
+
+
+def es_en_dolares(textos):
+    """Máscara vectorizada: True donde el texto del precio está en USD."""
+    return pd.Series(textos).astype(str).str.lower().str.contains('usd', regex=False)
+
+
+def convertir_a_ars(montos, es_usd, fechas, archivo=ARCHIVO_TASAS):
+    """Convierte a pesos los montos en USD usando la tasa vigente en cada fecha."""
+    montos = pd.Series(montos, dtype=float)
+    es_usd = pd.Series(es_usd, index=montos.index).fillna(False).astype(bool)
+    if not es_usd.any():
+        return montos
+    tasas = pd.Series(tasas_para_fechas(fechas, archivo), index=montos.index)
+    return montos.where(~es_usd, montos * tasas)